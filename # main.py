@@ -1,6 +1,10 @@
 import argparse
 import matplotlib.pyplot as plt  # Standard plotting library
+from matplotlib.animation import FFMpegWriter
 from simulation import RideSharingSimulation, Car
+from demand_trace import TraceRecorder, read_trace
+from event_log import EventLogRecorder
+from render import animate_replay
 
 def main():
     """Main function to run the ride-sharing simulation"""
@@ -10,19 +14,39 @@ def main():
     parser.add_argument('--max-time', type=float, default=50, help='Max simulation time')
     parser.add_argument('--mean-arrival', type=float, default=4, help='Mean arrival time')
     parser.add_argument('--map-file', type=str, default='map.csv', help='Map file')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for rider demand')
+    parser.add_argument('--record-trace', type=str, default=None, help='Write generated rider requests to this trace file')
+    parser.add_argument('--replay-trace', type=str, default=None, help='Replay rider requests from this trace file')
+    parser.add_argument('--event-log', type=str, default=None, help='Write car events to this log file')
+    parser.add_argument('--animation', type=str, default=None,
+                        help='Render the event log to a video (replay.mp4) or image sequence (frames/frame_%%05d.png)')
     
     args = parser.parse_args()
     
+    # Animated replay needs a recorded event log
+    if args.animation and not args.event_log:
+        parser.error('--animation requires --event-log')
+    if args.animation and '%' not in args.animation and not FFMpegWriter.isAvailable():
+        parser.error('--animation to a video needs ffmpeg; use an image pattern like frames/frame_%05d.png')
+    
     print("Starting ride-sharing simulation...")
     
     # Create simulation with command line settings
     sim = RideSharingSimulation(
         max_time=args.max_time,
         mean_arrival_time=args.mean_arrival,
-        map_file=args.map_file
+        map_file=args.map_file,
+        seed=args.seed,
+        demand_source=read_trace(args.replay_trace) if args.replay_trace else None,
+        trace_recorder=TraceRecorder(args.record_trace) if args.record_trace else None,
+        event_log=EventLogRecorder(args.event_log) if args.event_log else None
     )
     
     print(f"Map loaded with {len(sim.graph.node_coordinates)} nodes")
+    stats = sim.graph.preprocessing_stats
+    print(f"Road graph: {stats['raw_nodes']} nodes / {stats['raw_edges']} edges -> "
+          f"{stats['nodes']} nodes / {stats['edges']} edges "
+          f"(components: {stats['components']}, chains contracted: {stats['chains_contracted']})")
     
     # Add 5 cars at fixed starting positions
     car_locations = [
@@ -39,6 +63,12 @@ def main():
     # Run the simulation
     sim.run()
     
+    if sim.trace_recorder:
+        sim.trace_recorder.close()
+        print(f"Recorded {sim.trace_recorder.count} rider requests to {args.record_trace}")
+    if sim.event_log:
+        sim.event_log.close()
+    
     # Get results
     metrics = sim.calculate_metrics()
     
@@ -51,6 +81,11 @@ def main():
     
     # Create and show visualization
     sim.create_visualization()
+    
+    # Render the recorded run
+    if args.animation:
+        frames = animate_replay(sim.graph, args.event_log, args.animation)
+        print(f"Animation written with {frames} frames to {args.animation}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,73 @@
+import argparse
+import random
+import time
+from graph import Graph
+from dijkstra import find_shortest_path
+
+def build_grid(size, seed):
+    """
+    Synthetic road network: a size x size grid whose east-west streets are
+    split into degree-2 chains, with some parallel edges and a separate island.
+    """
+    rng = random.Random(seed)
+    graph = Graph()
+
+    for i in range(size):
+        for j in range(size):
+            if j + 1 < size and rng.random() < 0.8:
+                previous = f"{i}_{j}"
+                for k in range(3):
+                    graph.add_edge(previous, (i, j + 0.25 * k),
+                                   f"{i}_{j}_{k}", (i, j + 0.25 * (k + 1)), rng.uniform(0.1, 1))
+                    previous = f"{i}_{j}_{k}"
+                graph.add_edge(previous, (i, j + 0.75), f"{i}_{j + 1}", (i, j + 1), rng.uniform(0.1, 1))
+                if rng.random() < 0.1:
+                    graph.add_edge(f"{i}_{j}", (i, j), f"{i}_{j + 1}", (i, j + 1), rng.uniform(1, 5))
+            if i + 1 < size and rng.random() < 0.8:
+                graph.add_edge(f"{i}_{j}", (i, j), f"{i + 1}_{j}", (i + 1, j), rng.uniform(0.5, 2))
+    graph.add_edge("island_a", (size + 10, 0), "island_b", (size + 11, 0), 1.0)
+    graph.clear_preprocessing()
+    return graph
+
+def time_queries(graph, queries, repeats=1):
+    """Average milliseconds per find_shortest_path call"""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for start_node, end_node in queries:
+            find_shortest_path(graph, start_node, end_node)
+    return (time.perf_counter() - start) / (len(queries) * repeats) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark graph preprocessing')
+    parser.add_argument('--size', type=int, default=60, help='Grid size (size x size junctions)')
+    parser.add_argument('--queries', type=int, default=300, help='Number of random queries')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed')
+    args = parser.parse_args()
+
+    raw = build_grid(args.size, args.seed)
+    processed = build_grid(args.size, args.seed)
+    start = time.perf_counter()
+    stats = processed.preprocess()
+    preprocess_ms = (time.perf_counter() - start) * 1000
+
+    rng = random.Random(args.seed)
+    nodes = list(raw.node_coordinates)
+    queries = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(args.queries)]
+    unreachable = [("0_0", "island_a")]
+
+    raw_query = time_queries(raw, queries)
+    processed_query = time_queries(processed, queries)
+    raw_unreachable = time_queries(raw, unreachable, repeats=20)
+    processed_unreachable = time_queries(processed, unreachable, repeats=20)
+
+    print(f"Preprocessing took {preprocess_ms:.1f} ms")
+    print(f"{'':24}{'raw':>12}{'preprocessed':>14}")
+    print(f"{'nodes':24}{stats['raw_nodes']:>12}{stats['nodes']:>14}")
+    print(f"{'edges':24}{stats['raw_edges']:>12}{stats['edges']:>14}")
+    print(f"{'query (ms)':24}{raw_query:>12.3f}{processed_query:>14.3f}")
+    print(f"{'unreachable query (ms)':24}{raw_unreachable:>12.3f}{processed_unreachable:>14.4f}")
+    print(f"Components: {stats['components']}, chains contracted: {stats['chains_contracted']}, "
+          f"edges shadowed: {stats['edges_shadowed']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+# checkpoint.py
+# Snapshot and restore of the full simulation state in a compact binary format
+import struct
+from quadtree import Quadtree, Rectangle
+from rider import Rider
+from simulation import RideSharingSimulation, Car
+
+MAGIC = b"RSCK"
+FORMAT_VERSION = 3
+
+# Fixed-size records - everything is little-endian
+HEADER = struct.Struct("<4sH")
+SCALARS = struct.Struct("<dddqqqdd")
+DEMAND = struct.Struct("<?q")
+COUNT = struct.Struct("<I")
+CAR_RECORD = struct.Struct("<dd?q")
+INT_ID = struct.Struct("<Bq")
+STR_ID = struct.Struct("<BI")
+RIDER_RECORD = struct.Struct("<qddddBddd")
+EVENT_RECORD = struct.Struct("<dBii")
+TRACE_REQUEST = struct.Struct("<dddd")
+BOUNDARY = struct.Struct("<ddddI")
+POINT_RECORD = struct.Struct("<ddi")
+DIVIDED = struct.Struct("<?")
+RNG_RECORD = struct.Struct("<B625I?d")
+
+EVENT_TYPES = ["rider_request", "pickup_arrival", "ride_complete"]
+RIDER_STATUSES = ["waiting", "in_car", "completed"]
+
+# Car ids can be ints (simulation.py) or strings (car.py uses "C1")
+ID_INT = 0
+ID_STR = 1
+
+# Car index marking a rider_request that carries trace data (start, destination)
+TRACE_REQUEST_EVENT = -2
+
+
+def snapshot_simulation(sim):
+    """
+    Encode the live state of a simulation as bytes.
+    Covers the event heap, cars, riders still in flight, quadtree contents,
+    RNG state, metric totals and next_rider_id. The map and the trip history
+    (trip_data, completed_rides) are not included, so the size depends only
+    on what is currently live. For trace-driven runs only the number of rows
+    consumed is stored; pass the same trace again when restoring.
+    """
+    for car in sim.cars:
+        if isinstance(car.car_id, bool) or not isinstance(car.car_id, (int, str)):
+            raise ValueError(f"Cannot checkpoint car id {car.car_id!r}: ids must be int or str")
+
+    parts = [HEADER.pack(MAGIC, FORMAT_VERSION)]
+    parts.append(SCALARS.pack(
+        sim.max_time, sim.mean_arrival_time, sim.current_time,
+        sim.next_rider_id, sim.total_riders_generated,
+        sim.completed_trip_count, sim.total_wait_time, sim.total_trip_duration))
+    parts.append(DEMAND.pack(sim.demand_source is not None, sim.demand_consumed))
+
+    # Cars are referenced by their index in sim.cars
+    car_index = {id(car): i for i, car in enumerate(sim.cars)}
+    parts.append(COUNT.pack(len(sim.cars)))
+    for car in sim.cars:
+        _encode_id(car.car_id, parts)
+        parts.append(CAR_RECORD.pack(car.position[0], car.position[1],
+                                     car.available, car.rides_completed))
+
+    # Riders in flight are only reachable through pending events
+    riders = []
+    rider_index = {}
+    for _, event_type, data in sim.events:
+        if event_type != "rider_request" and id(data[1]) not in rider_index:
+            rider_index[id(data[1])] = len(riders)
+            riders.append(data[1])
+    parts.append(COUNT.pack(len(riders)))
+    for rider in riders:
+        parts.append(RIDER_RECORD.pack(
+            rider.id, rider.start_location[0], rider.start_location[1],
+            rider.destination[0], rider.destination[1],
+            RIDER_STATUSES.index(rider.status),
+            rider.request_time, rider.wait_time, rider.trip_duration))
+
+    # Heap list is stored in its current order so it stays a valid heap
+    parts.append(COUNT.pack(len(sim.events)))
+    for time, event_type, data in sim.events:
+        if data is None:
+            parts.append(EVENT_RECORD.pack(time, EVENT_TYPES.index(event_type), -1, -1))
+        elif event_type == "rider_request":
+            start_location, destination = data
+            parts.append(EVENT_RECORD.pack(time, EVENT_TYPES.index(event_type), TRACE_REQUEST_EVENT, -1))
+            parts.append(TRACE_REQUEST.pack(start_location[0], start_location[1],
+                                            destination[0], destination[1]))
+        else:
+            car, rider = data
+            parts.append(EVENT_RECORD.pack(time, EVENT_TYPES.index(event_type),
+                                           car_index[id(car)], rider_index[id(rider)]))
+
+    boundary = sim.quadtree.boundary
+    parts.append(BOUNDARY.pack(boundary.x, boundary.y, boundary.width, boundary.height,
+                               sim.quadtree.capacity))
+    _encode_quadtree(sim.quadtree, sim.quadtree.car_map, car_index, parts)
+
+    version, internal_state, gauss_next = sim.rng.getstate()
+    parts.append(RNG_RECORD.pack(version, *internal_state, gauss_next is not None,
+                                 gauss_next if gauss_next is not None else 0.0))
+
+    return b"".join(parts)
+
+
+def _encode_id(car_id, parts):
+    """Write a tagged car id - int64 or length-prefixed UTF-8 string"""
+    if isinstance(car_id, int):
+        parts.append(INT_ID.pack(ID_INT, car_id))
+    else:
+        encoded = car_id.encode('utf-8')
+        parts.append(STR_ID.pack(ID_STR, len(encoded)))
+        parts.append(encoded)
+
+
+def _encode_quadtree(node, car_map, car_index, parts):
+    """Write quadtree nodes in pre-order; child boundaries come from subdivide()"""
+    parts.append(COUNT.pack(len(node.points)))
+    for point in node.points:
+        car = car_map.get(point)
+        parts.append(POINT_RECORD.pack(point[0], point[1],
+                                       car_index[id(car)] if car else -1))
+    parts.append(DIVIDED.pack(node.divided))
+    if node.divided:
+        for child in (node.northwest, node.northeast, node.southwest, node.southeast):
+            _encode_quadtree(child, car_map, car_index, parts)
+
+
+class _Reader:
+    """Small cursor over the snapshot bytes"""
+    def __init__(self, data):
+        self.data = data
+        self.offset = 0
+
+    def read(self, record):
+        values = record.unpack_from(self.data, self.offset)
+        self.offset += record.size
+        return values
+
+    def count(self):
+        return self.read(COUNT)[0]
+
+    def read_bytes(self, size):
+        value = self.data[self.offset:self.offset + size]
+        self.offset += size
+        return value
+
+    def read_id(self):
+        (tag,) = struct.unpack_from("<B", self.data, self.offset)
+        if tag == ID_INT:
+            return self.read(INT_ID)[1]
+        length = self.read(STR_ID)[1]
+        return self.read_bytes(length).decode('utf-8')
+
+
+def restore_simulation(sim, data, demand_source=None):
+    """
+    Load a snapshot into an existing simulation, replacing its live state.
+    The simulation's graph is kept as is, so the map is never reparsed.
+    Also restores the simulation's random generator. Trip history starts out empty.
+    The target's demand_source, trace_recorder and event_log are cleared:
+    the snapshot's pending events would otherwise mix with a different
+    demand stream or be written to logs of another run.
+    A trace-driven snapshot needs demand_source (e.g. read_trace() on the
+    same file); the rows it had already consumed are skipped.
+    """
+    reader = _Reader(data)
+    magic, version = reader.read(HEADER)
+    if magic != MAGIC:
+        raise ValueError("Not a simulation checkpoint")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version {version}")
+
+    (sim.max_time, sim.mean_arrival_time, sim.current_time,
+     sim.next_rider_id, sim.total_riders_generated,
+     sim.completed_trip_count, sim.total_wait_time,
+     sim.total_trip_duration) = reader.read(SCALARS)
+
+    trace_driven, demand_consumed = reader.read(DEMAND)
+    if trace_driven and demand_source is None:
+        raise ValueError("Checkpoint was taken from a trace replay; pass its demand_source")
+    if not trace_driven and demand_source is not None:
+        raise ValueError("Checkpoint uses random demand; demand_source must be None")
+    if trace_driven:
+        demand_source = iter(demand_source)
+        for _ in range(demand_consumed):
+            if next(demand_source, None) is None:
+                raise ValueError(f"Demand source ended before the {demand_consumed} rows in the checkpoint")
+
+    cars = []
+    for _ in range(reader.count()):
+        car_id = reader.read_id()
+        x, y, available, rides_completed = reader.read(CAR_RECORD)
+        car = Car(car_id, (x, y))
+        car.available = available
+        car.rides_completed = rides_completed
+        cars.append(car)
+
+    riders = []
+    for _ in range(reader.count()):
+        (rider_id, sx, sy, dx, dy, status,
+         request_time, wait_time, trip_duration) = reader.read(RIDER_RECORD)
+        rider = Rider(rider_id, (sx, sy), (dx, dy))
+        rider.status = RIDER_STATUSES[status]
+        rider.request_time = request_time
+        rider.wait_time = wait_time
+        rider.trip_duration = trip_duration
+        riders.append(rider)
+
+    events = []
+    for _ in range(reader.count()):
+        time, event_type, car_i, rider_i = reader.read(EVENT_RECORD)
+        if car_i == TRACE_REQUEST_EVENT:
+            sx, sy, dx, dy = reader.read(TRACE_REQUEST)
+            event_data = ((sx, sy), (dx, dy))
+        else:
+            event_data = None if car_i < 0 else (cars[car_i], riders[rider_i])
+        events.append((time, EVENT_TYPES[event_type], event_data))
+
+    x, y, width, height, capacity = reader.read(BOUNDARY)
+    quadtree = Quadtree(Rectangle(x, y, width, height), capacity)
+    _decode_quadtree(quadtree, reader, cars)
+
+    version, *internal_state, has_gauss, gauss_next = reader.read(RNG_RECORD)
+    sim.rng.setstate((version, tuple(internal_state), gauss_next if has_gauss else None))
+
+    sim.cars = cars
+    sim.events = events
+    sim.quadtree = quadtree
+    sim.completed_rides = []
+    sim.trip_data = []
+    sim.demand_source = demand_source
+    sim.demand_consumed = demand_consumed
+    sim.trace_recorder = None
+    sim.event_log = None
+    return sim
+
+
+def _decode_quadtree(node, reader, cars):
+    """Rebuild a node and its children; car_map holds every point in the subtree like insert() does"""
+    for _ in range(reader.count()):
+        x, y, car_i = reader.read(POINT_RECORD)
+        node.points.append((x, y))
+        if car_i >= 0:
+            node.car_map[(x, y)] = cars[car_i]
+    (divided,) = reader.read(DIVIDED)
+    if divided:
+        node.subdivide()
+        for child in (node.northwest, node.northeast, node.southwest, node.southeast):
+            _decode_quadtree(child, reader, cars)
+            node.car_map.update(child.car_map)
+
+
+def fork_simulation(data, graph, demand_source=None):
+    """
+    Create a new simulation from a snapshot, sharing an already loaded graph.
+    Use this to branch many what-if scenarios from one warmed-up checkpoint.
+    Trace-driven snapshots need a fresh demand_source over the same trace.
+    """
+    sim = RideSharingSimulation(graph=graph)
+    return restore_simulation(sim, data, demand_source)
+
+
+def save_checkpoint(sim, filename):
+    """Write a snapshot of the simulation to a file"""
+    with open(filename, 'wb') as f:
+        f.write(snapshot_simulation(sim))
+
+
+def load_checkpoint(filename, graph, demand_source=None):
+    """Read a checkpoint file into a new simulation that reuses the given graph"""
+    with open(filename, 'rb') as f:
+        return fork_simulation(f.read(), graph, demand_source)
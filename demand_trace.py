@@ -0,0 +1,63 @@
+# demand_trace.py
+# Recording and streaming replay of rider demand traces
+#
+# Trace format is CSV, one rider request per line:
+#   timestamp,start_x,start_y,dest_x,dest_y
+# Lines starting with '#' and blank lines are ignored, same as map files.
+
+TRACE_HEADER = "# timestamp,start_x,start_y,dest_x,dest_y\n"
+
+
+class TraceRecorder:
+    """
+    Writes rider requests to a trace file as they are generated.
+    Pass one to RideSharingSimulation(trace_recorder=...) to capture a run.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self.file = open(filename, 'w')
+        self.file.write(TRACE_HEADER)
+        self.count = 0
+
+    def record(self, timestamp, start_location, destination):
+        """Append one request; repr keeps floats exact for replay"""
+        self.file.write(f"{timestamp!r},{start_location[0]!r},{start_location[1]!r},"
+                        f"{destination[0]!r},{destination[1]!r}\n")
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_trace(filename):
+    """
+    Stream (timestamp, start_location, destination) tuples from a trace file.
+    Reads one line at a time, so traces of any length use constant memory.
+    Raises ValueError on malformed rows or if timestamps go backwards,
+    so a bad trace never silently drops demand.
+    """
+    last_timestamp = float('-inf')
+    with open(filename, 'r') as f:
+        for line_number, line in enumerate(f, start=1):
+            if line.startswith('#') or not line.strip():
+                continue
+
+            parts = line.strip().split(',')
+            if len(parts) != 5:
+                raise ValueError(f"{filename}:{line_number}: expected 5 fields, got {len(parts)}")
+
+            try:
+                timestamp, start_x, start_y, dest_x, dest_y = map(float, parts)
+            except ValueError:
+                raise ValueError(f"{filename}:{line_number}: fields must be numbers") from None
+            if timestamp < last_timestamp:
+                raise ValueError(f"{filename}:{line_number}: trace is not in time order")
+            last_timestamp = timestamp
+
+            yield timestamp, (start_x, start_y), (dest_x, dest_y)
@@ -6,26 +6,53 @@ def find_shortest_path(graph, start_node, end_node):
    """
    Find shortest path between two nodes using Dijkstra's algorithm.
    Returns (path_list, total_distance) or (None, inf) if no path exists.
+   Works on preprocessed graphs too: contracted nodes enter and leave the
+   search through the ends of their chain, and contracted edges are expanded
+   so the returned path lists every node along the route.
    """
+   # Different components can never be connected - no search needed
+   if not graph.same_component(start_node, end_node):
+       return None, float('inf')
+   
    # Initialize distances and predecessors
    distances = {node: float('inf') for node in graph.adjacency_list}
-   distances[start_node] = 0
    predecessor = {node: None for node in graph.adjacency_list}
    
+   # Sources are the junctions the start node links to (itself if not contracted)
+   start_links = graph.chain_links(start_node)
+   end_links = graph.chain_links(end_node)
+   
    # Priority queue: (distance, node)
-   heap = [(0, start_node)]
+   heap = []
+   for junction, (offset, _) in start_links.items():
+       distances[junction] = offset
+       heapq.heappush(heap, (offset, junction))
+   
+   # Both nodes inside the same chain can also be connected directly
+   best_distance = float('inf')
+   best_junction = None
+   direct = graph.path_within_chain(start_node, end_node)
+   if direct:
+       best_distance = direct[0]
    
    while heap:
        current_distance, current_node = heapq.heappop(heap)
        
-       # Early termination when destination reached
-       if current_node == end_node:
+       # Early termination once nothing left can beat the best route
+       if current_distance >= best_distance:
            break
        
        # Skip if already found shorter path
        if current_distance > distances[current_node]:
            continue
        
+       # Leaving the graph here reaches the destination
+       if current_node in end_links:
+           total = current_distance + end_links[current_node][0]
+           if total < best_distance:
+               best_distance = total
+               best_junction = current_node
+       
        # Check all neighbors
        for neighbor, weight in graph.adjacency_list.get(current_node, []):
            distance = current_distance + weight
@@ -35,17 +62,24 @@ def find_shortest_path(graph, start_node, end_node):
                heapq.heappush(heap, (distance, neighbor))
    
    # Return None if unreachable
-   if distances[end_node] == float('inf'):
+   if best_distance == float('inf'):
        return None, float('inf')
+   if best_junction is None:
+       return direct[1], best_distance
    
-   # Reconstruct path
-   path = []
-   node = end_node
+   # Reconstruct path through junctions, expanding contracted edges
+   junctions = []
+   node = best_junction
    while node is not None:
-       path.insert(0, node)
+       junctions.insert(0, node)
        node = predecessor[node]
    
-   return path, distances[end_node]
+   path = start_links[junctions[0]][1][:-1]
+   for node_a, node_b in zip(junctions, junctions[1:]):
+       path.extend(graph.expand_edge(node_a, node_b)[:-1])
+   path.extend(end_links[best_junction][1][::-1])
+   
+   return path, best_distance
 
 def calculate_travel_time_with_graph(graph, start_point, end_point):
    """
@@ -0,0 +1,58 @@
+# event_log.py
+# Recording of car movements during a simulation run, used for animated replay
+#
+# Log format is CSV, one car event per line in time order:
+#   time,event,car_id,x,y
+# where event is one of: add, assign, pickup, dropoff
+
+EVENT_LOG_HEADER = "# time,event,car_id,x,y\n"
+EVENT_NAMES = {"add", "assign", "pickup", "dropoff"}
+
+
+class EventLogRecorder:
+    """
+    Writes car events to a log file as the simulation processes them.
+    Pass one to RideSharingSimulation(event_log=...) to capture a run.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self.file = open(filename, 'w')
+        self.file.write(EVENT_LOG_HEADER)
+
+    def record(self, time, event, car_id, position):
+        self.file.write(f"{time!r},{event},{car_id},{position[0]!r},{position[1]!r}\n")
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_event_log(filename):
+    """
+    Stream (time, event, car_id, (x, y)) tuples from an event log.
+    Reads one line at a time; car ids are returned as strings.
+    Raises ValueError on malformed rows so a corrupt log can't render wrong frames.
+    """
+    with open(filename, 'r') as f:
+        for line_number, line in enumerate(f, start=1):
+            if line.startswith('#') or not line.strip():
+                continue
+
+            parts = line.strip().split(',')
+            if len(parts) != 5:
+                raise ValueError(f"{filename}:{line_number}: expected 5 fields, got {len(parts)}")
+
+            time, event, car_id, x, y = parts
+            if event not in EVENT_NAMES:
+                raise ValueError(f"{filename}:{line_number}: unknown event '{event}'")
+            try:
+                position = (float(x), float(y))
+                time = float(time)
+            except ValueError:
+                raise ValueError(f"{filename}:{line_number}: time and position must be numbers") from None
+            yield time, event, car_id, position
@@ -6,8 +6,19 @@ class Graph:
     def __init__(self):
         self.adjacency_list = collections.defaultdict(list)
         self.node_coordinates = {}
+        
+        # Every loaded edge, untouched - adjacency_list is rebuilt from this
+        self.raw_adjacency = collections.defaultdict(list)
+        
+        # Filled in by preprocess()
+        self.component_labels = {}   # node -> connected component id (every node)
+        self.edge_paths = {}         # (u, v) -> interior nodes of a contracted edge
+        self.chains = []             # (nodes, cumulative distances) for each contracted chain
+        self.chain_of = {}           # interior node -> (chain index, position in chain)
+        self.shadowed_edges = []     # (u, v) direct roads replaced by a cheaper chain
+        self.preprocessing_stats = {}
     
-    def load_map_data(self, filename):
+    def load_map_data(self, filename, preprocess=True):
         with open(filename, 'r') as f:
             for line in f:
                 if line.startswith('#') or not line.strip():
@@ -19,12 +30,202 @@ class Graph:
                 
                 start_id, start_x, start_y, end_id, end_x, end_y, weight = parts
                 
-                self.node_coordinates[start_id] = (float(start_x), float(start_y))
-                self.node_coordinates[end_id] = (float(end_x), float(end_y))
-                
-                self.adjacency_list[start_id].append((end_id, float(weight)))
-                self.adjacency_list[end_id].append((start_id, float(weight)))
+                self.add_edge(start_id, (float(start_x), float(start_y)),
+                              end_id, (float(end_x), float(end_y)), float(weight))
+        
+        if preprocess:
+            self.preprocess()
+        else:
+            self.clear_preprocessing()
     
+    def add_edge(self, start_id, start_position, end_id, end_position, weight):
+        """
+        Record an undirected road in the raw edge list.
+        Call preprocess() or clear_preprocessing() afterwards to rebuild
+        adjacency_list for routing.
+        """
+        self.node_coordinates[start_id] = start_position
+        self.node_coordinates[end_id] = end_position
+        
+        self.raw_adjacency[start_id].append((end_id, weight))
+        self.raw_adjacency[end_id].append((start_id, weight))
+    
+    def clear_preprocessing(self):
+        """Route on the raw edge list as loaded, without any preprocessing"""
+        self.adjacency_list = collections.defaultdict(
+            list, {node_id: list(neighbors) for node_id, neighbors in self.raw_adjacency.items()})
+        self.component_labels = {}
+        self.edge_paths = {}
+        self.chains = []
+        self.chain_of = {}
+        self.shadowed_edges = []
+        self.preprocessing_stats = {}
+
+    def preprocess(self):
+        """
+        Clean up the loaded road network for faster routing:
+        - merge parallel edges down to the minimum weight (self-loops are dropped)
+        - label connected components so unreachable queries fail in O(1)
+        - contract chains of degree-2 nodes into single edges, keeping the
+          interior nodes so full routes can still be reconstructed
+        Contracted nodes keep their coordinates and can still be used as
+        start or end points by find_shortest_path.
+        Always rebuilds from the raw edge list, so it is safe to call again
+        after loading more map files.
+        """
+        raw_nodes = len(self.raw_adjacency)
+        raw_edges = sum(len(neighbors) for neighbors in self.raw_adjacency.values()) // 2
+
+        # Merge parallel edges, keeping the cheapest one
+        weights = {}
+        for node_id, neighbors in self.raw_adjacency.items():
+            node_weights = weights.setdefault(node_id, {})
+            for neighbor_id, weight in neighbors:
+                if neighbor_id != node_id and weight < node_weights.get(neighbor_id, float('inf')):
+                    node_weights[neighbor_id] = weight
+
+        # Connected components by BFS over the merged graph
+        self.component_labels = {}
+        component_count = 0
+        for node_id in weights:
+            if node_id in self.component_labels:
+                continue
+            label = component_count
+            component_count += 1
+            self.component_labels[node_id] = label
+            queue = collections.deque([node_id])
+            while queue:
+                current = queue.popleft()
+                for neighbor_id in weights[current]:
+                    if neighbor_id not in self.component_labels:
+                        self.component_labels[neighbor_id] = label
+                        queue.append(neighbor_id)
+
+        # Contract degree-2 chains between kept nodes
+        kept = {node_id for node_id, neighbors in weights.items() if len(neighbors) != 2}
+        self.chains = []
+        self.chain_of = {}
+        for node_id in weights:
+            if node_id in kept:
+                self._walk_chains(node_id, weights, kept)
+
+        # Whatever is left are isolated cycles - anchor each one on a single node
+        for node_id in weights:
+            if node_id not in kept and node_id not in self.chain_of:
+                kept.add(node_id)
+                self._walk_chains(node_id, weights, kept)
+
+        # Build the contracted adjacency list, again keeping only the cheapest edge
+        best = {}
+        for node_id in weights:
+            if node_id not in kept:
+                continue
+            for neighbor_id, weight in weights[node_id].items():
+                if neighbor_id in kept:
+                    best[(node_id, neighbor_id)] = (weight, None)
+        self.shadowed_edges = []
+        for nodes, distances in self.chains:
+            u, v = nodes[0], nodes[-1]
+            if u == v:
+                continue
+            current = best.get((u, v))
+            if current is None or distances[-1] < current[0]:
+                # The road itself still exists, it just never wins a route
+                if current is not None and current[1] is None:
+                    self.shadowed_edges.append((u, v))
+                best[(u, v)] = (distances[-1], nodes[1:-1])
+                best[(v, u)] = (distances[-1], nodes[-2:0:-1])
+
+        self.adjacency_list = collections.defaultdict(list)
+        self.edge_paths = {}
+        for node_id in weights:
+            if node_id in kept:
+                self.adjacency_list[node_id] = []
+        for (u, v), (weight, interior) in best.items():
+            self.adjacency_list[u].append((v, weight))
+            if interior is not None:
+                self.edge_paths[(u, v)] = interior
+
+        self.preprocessing_stats = {
+            "raw_nodes": raw_nodes,
+            "raw_edges": raw_edges,
+            "nodes": len(self.adjacency_list),
+            "edges": len(best) // 2,
+            "components": component_count,
+            "parallel_edges_merged": raw_edges - sum(len(n) for n in weights.values()) // 2,
+            "chains_contracted": len(self.chains),
+            "nodes_contracted": len(self.chain_of),
+            "edges_shadowed": len(self.shadowed_edges),
+        }
+        return self.preprocessing_stats
+
+    def _walk_chains(self, start_id, weights, kept):
+        """Follow every unvisited degree-2 path leaving start_id until it reaches a kept node"""
+        for first_id in weights[start_id]:
+            if first_id in kept or first_id in self.chain_of:
+                continue
+
+            chain_index = len(self.chains)
+            nodes = [start_id]
+            distances = [0.0]
+            previous, current = start_id, first_id
+            while True:
+                nodes.append(current)
+                distances.append(distances[-1] + weights[previous][current])
+                if current in kept:
+                    break
+                self.chain_of[current] = (chain_index, len(nodes) - 1)
+                next_id = next(n for n in weights[current] if n != previous)
+                previous, current = current, next_id
+
+            self.chains.append((nodes, distances))
+
+    def same_component(self, node_a, node_b):
+        """O(1) reachability check; always True before preprocessing"""
+        if not self.component_labels:
+            return True
+        return self.component_labels.get(node_a) == self.component_labels.get(node_b)
+
+    def chain_links(self, node_id):
+        """
+        Ways to get from node_id onto the contracted graph, as a dict
+        junction -> (distance, path from node_id to junction).
+        A node still in the graph just links to itself.
+        """
+        if node_id not in self.chain_of:
+            return {node_id: (0, [node_id])}
+
+        chain_index, position = self.chain_of[node_id]
+        nodes, distances = self.chains[chain_index]
+        links = {}
+        for junction, distance, path in (
+                (nodes[0], distances[position], nodes[position::-1]),
+                (nodes[-1], distances[-1] - distances[position], nodes[position:])):
+            if distance < links.get(junction, (float('inf'), None))[0]:
+                links[junction] = (distance, path)
+        return links
+
+    def path_within_chain(self, node_a, node_b):
+        """Direct (distance, path) between two nodes inside the same chain, or None"""
+        if node_a not in self.chain_of or node_b not in self.chain_of:
+            return None
+
+        chain_a, position_a = self.chain_of[node_a]
+        chain_b, position_b = self.chain_of[node_b]
+        if chain_a != chain_b:
+            return None
+
+        nodes, distances = self.chains[chain_a]
+        if position_a <= position_b:
+            path = nodes[position_a:position_b + 1]
+        else:
+            path = nodes[position_b:position_a + 1][::-1]
+        return abs(distances[position_b] - distances[position_a]), path
+
+    def expand_edge(self, node_a, node_b):
+        """Full node sequence of an edge in the adjacency list, including contracted nodes"""
+        return [node_a] + self.edge_paths.get((node_a, node_b), []) + [node_b]
+
     def find_nearest_vertex(self, point):
         if not self.node_coordinates:
             raise ValueError("No coordinates loaded")
@@ -2,6 +2,7 @@ import heapq
 import random
 import argparse
 import matplotlib.pyplot as plt  # Standard plotting library
+from render import draw_road_network
 from quadtree import Quadtree, Rectangle
 from dijkstra import find_shortest_path
 from rider import Rider
@@ -19,15 +20,21 @@ class Car:
 
 
 class RideSharingSimulation:
-    def __init__(self, max_time=100, mean_arrival_time=5, map_file='map.csv'):
+    def __init__(self, max_time=100, mean_arrival_time=5, map_file='map.csv', graph=None,
+                 demand_source=None, trace_recorder=None, event_log=None, seed=None):
         self.max_time = max_time
         self.mean_arrival_time = mean_arrival_time
         self.current_time = 0
         self.next_rider_id = 1
         
-        # Load map and setup quadtree for fast car lookup
-        self.graph = Graph()
-        self.graph.load_map_data(map_file)
+        # Own random generator so forks and parallel runs don't share state
+        self.rng = random.Random(seed)
+        
+        # Load map (or reuse an already loaded one) and setup quadtree for fast car lookup
+        if graph is None:
+            graph = Graph()
+            graph.load_map_data(map_file)
+        self.graph = graph
         
         min_x, min_y, max_x, max_y = self.graph.get_bounds()
         boundary = Rectangle(min_x, min_y, max_x - min_x + 1, max_y - min_y + 1)
@@ -39,30 +46,61 @@ class RideSharingSimulation:
         self.completed_rides = []
         self.trip_data = []
         self.total_riders_generated = 0
+        
+        # Demand: random requests by default, or (timestamp, start, destination)
+        # tuples from a replay source such as demand_trace.read_trace()
+        self.demand_source = iter(demand_source) if demand_source is not None else None
+        self.demand_consumed = 0  # rows read from demand_source, so checkpoints can skip ahead
+        self.trace_recorder = trace_recorder
+        
+        # Optional event_log.EventLogRecorder for animated replay of car movements
+        self.event_log = event_log
+        
+        # Running metric totals so metrics don't depend on the full trip history
+        self.completed_trip_count = 0
+        self.total_wait_time = 0
+        self.total_trip_duration = 0
 
     def add_car(self, car):
         self.cars.append(car)
         self.quadtree.insert(car.position, car)
+        if self.event_log:
+            self.event_log.record(self.current_time, "add", car.car_id, car.position)
 
     def generate_rider_request(self):
         """Generate a rider with random start and end points"""
         min_x, min_y, max_x, max_y = self.graph.get_bounds()
-        start_x = random.uniform(min_x, max_x)
-        start_y = random.uniform(min_y, max_y)
-        end_x = random.uniform(min_x, max_x)
-        end_y = random.uniform(min_y, max_y)
+        start_x = self.rng.uniform(min_x, max_x)
+        start_y = self.rng.uniform(min_y, max_y)
+        end_x = self.rng.uniform(min_x, max_x)
+        end_y = self.rng.uniform(min_y, max_y)
         
-        rider = Rider(self.next_rider_id, (start_x, start_y), (end_x, end_y))
+        return self.create_rider((start_x, start_y), (end_x, end_y))
+
+    def create_rider(self, start_location, destination):
+        """Create the next rider for a given trip"""
+        rider = Rider(self.next_rider_id, start_location, destination)
         self.total_riders_generated += 1
         self.next_rider_id += 1
         return rider
 
-    def run(self):
-        # Start with first rider request
-        heapq.heappush(self.events, (0, "rider_request", None))
+    def run(self, until=None):
+        """
+        Process events until the simulation ends.
+        With until set, stops before the first event later than that time so
+        the run can be checkpointed and resumed by calling run() again.
+        """
+        # Start with first rider request (only on a fresh simulation)
+        if not self.events and self.current_time == 0:
+            if self.demand_source is not None:
+                self.schedule_trace_request()
+            else:
+                heapq.heappush(self.events, (0, "rider_request", None))
 
         # Process events until simulation ends
         while self.events and self.current_time < self.max_time:
+            if until is not None and self.events[0][0] > until:
+                break
             time, event_type, data = heapq.heappop(self.events)
             
             if time > self.max_time:
@@ -71,7 +109,7 @@ class RideSharingSimulation:
             self.current_time = time
 
             if event_type == "rider_request":
-                self.handle_rider_request()
+                self.handle_rider_request(data)
             elif event_type == "pickup_arrival":
                 car, rider = data
                 self.handle_pickup_arrival(car, rider)
@@ -79,10 +117,32 @@ class RideSharingSimulation:
                 car, rider = data
                 self.handle_ride_complete(car, rider)
 
-    def handle_rider_request(self):
-        rider = self.generate_rider_request()
+    def schedule_trace_request(self):
+        """
+        Pull the next request from the demand source into the event queue.
+        Only one request is pending at a time, so the source is read lazily.
+        """
+        request = next(self.demand_source, None)
+        if request is None:
+            return
+        self.demand_consumed += 1
+        
+        request_time, start_location, destination = request
+        if request_time < self.current_time:
+            raise ValueError(f"Demand source went back in time at {request_time}")
+        if request_time < self.max_time:
+            heapq.heappush(self.events, (request_time, "rider_request", (start_location, destination)))
+
+    def handle_rider_request(self, request=None):
+        if request is None:
+            rider = self.generate_rider_request()
+        else:
+            rider = self.create_rider(*request)
         rider.request_time = self.current_time
         
+        if self.trace_recorder:
+            self.trace_recorder.record(self.current_time, rider.start_location, rider.destination)
+        
         # Find nearest available cars and pick the best one
         k_nearest = self.quadtree.find_k_nearest(rider.start_location, k=5)
         
@@ -104,6 +164,8 @@ class RideSharingSimulation:
             # Assign car to rider
             self.quadtree.remove(best_car.position)
             best_car.available = False
+            if self.event_log:
+                self.event_log.record(self.current_time, "assign", best_car.car_id, best_car.position)
             
             # Calculate pickup and dropoff times
             pickup_time = self.current_time + best_time
@@ -120,8 +182,10 @@ class RideSharingSimulation:
             heapq.heappush(self.events, (dropoff_time, "ride_complete", (best_car, rider)))
         
         # Schedule next rider request
-        if self.current_time < self.max_time:
-            next_request_time = self.current_time + random.expovariate(1.0 / self.mean_arrival_time)
+        if self.demand_source is not None:
+            self.schedule_trace_request()
+        elif self.current_time < self.max_time:
+            next_request_time = self.current_time + self.rng.expovariate(1.0 / self.mean_arrival_time)
             if next_request_time < self.max_time:
                 heapq.heappush(self.events, (next_request_time, "rider_request", None))
 
@@ -138,18 +202,25 @@ class RideSharingSimulation:
             'trip_duration': rider.trip_duration,
             'completion_time': self.current_time
         })
+        self.completed_trip_count += 1
+        self.total_wait_time += rider.wait_time
+        self.total_trip_duration += rider.trip_duration
         
         self.completed_rides.append((rider.id, car.car_id, self.current_time))
         self.quadtree.insert(car.position, car)
+        if self.event_log:
+            self.event_log.record(self.current_time, "dropoff", car.car_id, car.position)
         
         print(f"TIME {self.current_time:.2f}: Rider {rider.id} dropped off by Car {car.car_id}")
     
     def handle_pickup_arrival(self, car, rider):
         car.position = rider.start_location
+        if self.event_log:
+            self.event_log.record(self.current_time, "pickup", car.car_id, car.position)
         print(f"TIME {self.current_time:.2f}: Car {car.car_id} picked up Rider {rider.id}")
 
     def calculate_metrics(self):
-        if not self.trip_data:
+        if not self.completed_trip_count:
             return {
                 "total_trips": 0,
                 "total_riders_generated": self.total_riders_generated,
@@ -158,9 +229,9 @@ class RideSharingSimulation:
                 "rides_per_car": {car.car_id: car.rides_completed for car in self.cars}
             }
         
-        total_rides = len(self.trip_data)
-        avg_wait = sum(trip['wait_time'] for trip in self.trip_data) / total_rides
-        avg_duration = sum(trip['trip_duration'] for trip in self.trip_data) / total_rides
+        total_rides = self.completed_trip_count
+        avg_wait = self.total_wait_time / total_rides
+        avg_duration = self.total_trip_duration / total_rides
         rides_per_car = {car.car_id: car.rides_completed for car in self.cars}
         
         return {
@@ -171,16 +242,12 @@ class RideSharingSimulation:
             "rides_per_car": rides_per_car,
         }
 
-    def create_visualization(self, filename='simulation_summary.png'):
+    def create_visualization(self, filename='simulation_summary.png', dpi=150):
         """Create visualization with matplotlib"""
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
         
-        # Left side: map with final car positions
-        for node_id, neighbors in self.graph.adjacency_list.items():
-            x1, y1 = self.graph.node_coordinates[node_id]
-            for neighbor_id, _ in neighbors:
-                x2, y2 = self.graph.node_coordinates[neighbor_id]
-                ax1.plot([x1, x2], [y1, y2], 'lightgray', linewidth=0.5)
+        # Left side: map with final car positions (all roads in one LineCollection)
+        draw_road_network(ax1, self.graph)
         
         car_x = [car.position[0] for car in self.cars]
         car_y = [car.position[1] for car in self.cars]
@@ -212,7 +279,7 @@ RIDES PER CAR:"""
         ax2.axis('off')
         
         plt.tight_layout()
-        plt.savefig(filename, dpi=300)
+        plt.savefig(filename, dpi=dpi)
         plt.show()
         
         print(f"Visualization saved as {filename}")
@@ -0,0 +1,77 @@
+import os
+import tempfile
+from checkpoint import snapshot_simulation, restore_simulation, fork_simulation
+from demand_trace import TraceRecorder, read_trace
+from simulation import RideSharingSimulation, Car
+from test_helpers import make_simulation
+
+def main():
+    # Uninterrupted reference run
+    reference = make_simulation()
+    reference.run()
+    expected = reference.calculate_metrics()
+
+    # Same run paused halfway and resumed from a checkpoint
+    warm = make_simulation(graph=reference.graph)
+    warm.run(until=100)
+    data = snapshot_simulation(warm)
+
+    resumed = fork_simulation(data, reference.graph)
+    resumed.run()
+    actual = resumed.calculate_metrics()
+
+    print(f"Checkpoint size: {len(data)} bytes")
+    print(f"Reference: {expected}")
+    print(f"Resumed:   {actual}")
+
+    assert actual == expected, "Resumed run diverged from uninterrupted run!"
+    assert resumed.next_rider_id == reference.next_rider_id, "Rider ids diverged!"
+
+    # Forks of one checkpoint must replay the same scenario
+    fork_a = fork_simulation(data, reference.graph)
+    fork_b = fork_simulation(data, reference.graph)
+    fork_a.run()
+    fork_b.run()
+    assert fork_a.calculate_metrics() == fork_b.calculate_metrics(), "Forks of one checkpoint diverged!"
+    assert fork_a.calculate_metrics() == expected, "Fork diverged from uninterrupted run!"
+
+    # Restoring replaces the target's demand stream and recorders
+    target = RideSharingSimulation(graph=reference.graph, demand_source=[(1.0, (0, 0), (2, 2))])
+    restore_simulation(target, data)
+    assert target.demand_source is None, "Restored simulation kept the old demand source!"
+
+    # String car ids (as in car.py) survive a round trip
+    named = RideSharingSimulation(max_time=50, graph=reference.graph, seed=3)
+    named.add_car(Car("C1", (0, 0)))
+    named.add_car(Car(2, (4, 0)))
+    named.run(until=25)
+    restored = fork_simulation(snapshot_simulation(named), reference.graph)
+    assert [car.car_id for car in restored.cars] == ["C1", 2], "Car ids changed in round trip!"
+
+    # Trace replay paused halfway resumes from the same trace
+    with tempfile.TemporaryDirectory() as directory:
+        trace_file = os.path.join(directory, 'trace.csv')
+        with TraceRecorder(trace_file) as recorder:
+            make_simulation(graph=reference.graph, trace_recorder=recorder).run()
+
+        replay = make_simulation(graph=reference.graph, demand_source=read_trace(trace_file))
+        replay.run()
+
+        warm_replay = make_simulation(graph=reference.graph, demand_source=read_trace(trace_file))
+        warm_replay.run(until=100)
+        trace_data = snapshot_simulation(warm_replay)
+
+        resumed_replay = fork_simulation(trace_data, reference.graph, read_trace(trace_file))
+        resumed_replay.run()
+        assert resumed_replay.calculate_metrics() == replay.calculate_metrics(), "Resumed replay diverged!"
+        assert resumed_replay.next_rider_id == replay.next_rider_id, "Replay rider ids diverged!"
+
+        try:
+            fork_simulation(trace_data, reference.graph)
+        except ValueError as error:
+            print(f"Rejected as expected: {error}")
+        else:
+            raise AssertionError("Trace checkpoint restored without its demand source!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import os
+import random
+import tempfile
+import matplotlib
+matplotlib.use('Agg')  # Render without a display
+from graph import Graph
+from dijkstra import find_shortest_path
+from render import edge_segments
+
+def build_graph(preprocess):
+    # Grid whose streets are split into degree-2 chains, with some parallel
+    # edges, plus an isolated cycle and a separate island
+    rng = random.Random(7)
+    graph = Graph()
+
+    def add_edge(a, b, weight):
+        graph.add_edge(a, (rng.uniform(0, 20), rng.uniform(0, 20)),
+                       b, (rng.uniform(0, 20), rng.uniform(0, 20)), weight)
+
+    for i in range(20):
+        for j in range(20):
+            if j + 1 < 20:
+                previous = f"{i}_{j}"
+                for k in range(3):
+                    add_edge(previous, f"{i}_{j}_{k}", rng.uniform(0.1, 1))
+                    previous = f"{i}_{j}_{k}"
+                add_edge(previous, f"{i}_{j + 1}", rng.uniform(0.1, 1))
+            if i + 1 < 20 and rng.random() < 0.7:
+                add_edge(f"{i}_{j}", f"{i + 1}_{j}", rng.uniform(0.5, 2))
+                if rng.random() < 0.2:
+                    add_edge(f"{i}_{j}", f"{i + 1}_{j}", rng.uniform(0.5, 2))
+    for k in range(5):
+        add_edge(f"cycle{k}", f"cycle{(k + 1) % 5}", 1.0)
+    add_edge("island_a", "island_b", 1.0)
+
+    if preprocess:
+        graph.preprocess()
+    else:
+        graph.clear_preprocessing()
+    return graph
+
+def all_pair_distances(graph):
+    nodes = sorted(graph.node_coordinates)
+    return {(a, b): find_shortest_path(graph, a, b)[1] for a in nodes for b in nodes}
+
+def main():
+    raw = build_graph(preprocess=False)
+    processed = build_graph(preprocess=True)
+    print(f"Preprocessing stats: {processed.preprocessing_stats}")
+
+    nodes = list(raw.node_coordinates)
+    rng = random.Random(11)
+    queries = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(200)]
+    queries += [("0_0", "island_a"), ("cycle1", "cycle3"), ("0_0_1", "0_0_2"), ("5_5", "5_5")]
+
+    for start, end in queries:
+        raw_path, raw_distance = find_shortest_path(raw, start, end)
+        path, distance = find_shortest_path(processed, start, end)
+
+        if raw_path is None:
+            assert path is None, f"Found a path that should not exist: {start} -> {end}"
+            continue
+
+        assert abs(distance - raw_distance) < 1e-9, f"Distance mismatch for {start} -> {end}!"
+
+        # Expanded route must be a real walk through the original graph
+        assert path[0] == start and path[-1] == end, "Route does not connect the query nodes!"
+        walked = sum(min(w for n, w in raw.adjacency_list[a] if n == b) for a, b in zip(path, path[1:]))
+        assert abs(walked - distance) < 1e-9, f"Expanded route length mismatch for {start} -> {end}!"
+
+    print(f"All {len(queries)} queries match the unprocessed graph")
+
+    # Preprocessing changes routing, not the roads that get drawn
+    assert len(edge_segments(processed)) == len(edge_segments(raw)), "Roads lost from the rendered map!"
+
+    # A direct road shadowed by a cheaper chain (u-x-v) must still be drawn
+    shadowed = Graph()
+    for a, b, weight in [("u", "v", 5.0), ("u", "x", 1.0), ("x", "v", 1.0),
+                         ("u", "p", 1.0), ("u", "q", 1.0), ("v", "r", 1.0), ("v", "s", 1.0)]:
+        shadowed.add_edge(a, (rng.uniform(0, 5), rng.uniform(0, 5)),
+                          b, (rng.uniform(0, 5), rng.uniform(0, 5)), weight)
+    shadowed.clear_preprocessing()
+    before = len(edge_segments(shadowed))
+    shadowed.preprocess()
+    assert shadowed.shadowed_edges, "Expected u-v to be shadowed by the chain!"
+    assert len(edge_segments(shadowed)) == before, "Shadowed road disappeared from the map!"
+
+    # Preprocessing twice gives the same graph as preprocessing once
+    unprocessed = Graph()
+    unprocessed.load_map_data('map.csv', preprocess=False)
+    expected = all_pair_distances(unprocessed)
+    twice = Graph()
+    twice.load_map_data('map.csv')
+    first_stats = dict(twice.preprocessing_stats)
+    twice.preprocess()
+    assert twice.preprocessing_stats == first_stats, "Second preprocess() changed the stats!"
+    assert all_pair_distances(twice) == expected, "Second preprocess() changed routes!"
+
+    # Loading a map split across two files matches loading it in one go
+    with open('map.csv') as f:
+        lines = f.readlines()
+    with tempfile.TemporaryDirectory() as directory:
+        first_file = os.path.join(directory, 'first.csv')
+        second_file = os.path.join(directory, 'second.csv')
+        with open(first_file, 'w') as f:
+            f.writelines(lines[:len(lines) // 2])
+        with open(second_file, 'w') as f:
+            f.writelines(lines[len(lines) // 2:])
+        split = Graph()
+        split.load_map_data(first_file)
+        split.load_map_data(second_file)
+    assert all_pair_distances(split) == expected, "Map loaded from two files routes differently!"
+    print(f"A -> E: {find_shortest_path(split, 'A', 'E')}")
+
+if __name__ == "__main__":
+    main()
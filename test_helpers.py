@@ -0,0 +1,13 @@
+# test_helpers.py
+# Shared setup for the simulation test scripts
+from simulation import RideSharingSimulation, Car
+
+CAR_LOCATIONS = [(0, 0), (2, 0), (4, 0), (6, 0), (8, 0)]
+
+def make_simulation(graph=None, seed=42, max_time=200, **kwargs):
+    """Simulation on map.csv with five cars along the bottom row, same as main.py"""
+    sim = RideSharingSimulation(max_time=max_time, mean_arrival_time=4, map_file='map.csv',
+                                graph=graph, seed=seed, **kwargs)
+    for i, location in enumerate(CAR_LOCATIONS):
+        sim.add_car(Car(i + 1, location))
+    return sim
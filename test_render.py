@@ -0,0 +1,49 @@
+import math
+import os
+import tempfile
+import matplotlib
+matplotlib.use('Agg')  # Render without a display
+from event_log import EventLogRecorder, read_event_log
+from render import edge_segments, animate_replay
+from test_helpers import make_simulation
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        log_file = os.path.join(directory, 'events.csv')
+
+        with EventLogRecorder(log_file) as event_log:
+            sim = make_simulation(max_time=20, event_log=event_log)
+            sim.run()
+
+        # map.csv has 37 undirected roads - each must be drawn exactly once
+        segments = edge_segments(sim.graph)
+        print(f"Road segments: {len(segments)}")
+        assert segments.shape == (37, 2, 2), "Expected one segment per undirected edge!"
+
+        # One frame per time step from 0 up to the last logged event
+        with open(log_file) as f:
+            last_time = max(float(line.split(',')[0]) for line in f if not line.startswith('#'))
+        frame_pattern = os.path.join(directory, 'frame_%04d.png')
+        frames = animate_replay(sim.graph, log_file, frame_pattern, frame_interval=1.0, dpi=50)
+        print(f"Frames written: {frames} (last event at {last_time:.2f})")
+
+        assert frames == math.ceil(last_time) + 1, "Unexpected frame count!"
+        for frame_number in range(frames):
+            assert os.path.getsize(frame_pattern % frame_number) > 0, f"Frame {frame_number} missing!"
+        assert not os.path.exists(frame_pattern % frames), "Wrote more frames than reported!"
+
+        # Corrupt logs must fail loudly instead of rendering wrong frames
+        for name, row in [("short", "1.0,add,1,0\n"), ("number", "1.0,add,1,zero,0\n"),
+                          ("event", "1.0,teleport,1,0,0\n")]:
+            bad_log = os.path.join(directory, f'bad_{name}.csv')
+            with open(bad_log, 'w') as f:
+                f.write(row)
+            try:
+                list(read_event_log(bad_log))
+            except ValueError as error:
+                print(f"Rejected as expected: {error}")
+            else:
+                raise AssertionError(f"Malformed event log row was accepted: {row.strip()}")
+
+if __name__ == "__main__":
+    main()